@@ -21,6 +21,7 @@ Usage:
 """
 
 import os
+import time
 import uuid
 from typing import Generator
 
@@ -32,8 +33,11 @@ BASE_URL = os.getenv("FRAUD_ENGINE_BASE_URL", "http://localhost:8081")
 # Auth mode: "jwt" or "none"
 AUTH_MODE = os.getenv("E2E_AUTH_MODE", "none").lower()
 
-# Module-level token cache (fetched once, reused for entire session)
+# Module-level token cache. Fetched once and reused until ~80% of its
+# expires_in has elapsed, then refreshed -- long soak sessions get a
+# fresh token before Auth0 expires the old one instead of 401ing mid-run.
 _cached_token: str | None = None
+_token_deadline: float = 0.0
 
 
 def _is_jwt_mode() -> bool:
@@ -49,10 +53,11 @@ def _is_jwt_mode() -> bool:
 def _fetch_auth0_token() -> str:
     """
     Fetch a real Auth0 M2M token using environment variables.
-    Token is cached at module level - only ONE call per test session.
+    Token is cached at module level and refreshed preemptively at 80%
+    of its TTL, so even multi-hour sessions never present an expired JWT.
     """
-    global _cached_token
-    if _cached_token is not None:
+    global _cached_token, _token_deadline
+    if _cached_token is not None and time.monotonic() < _token_deadline:
         return _cached_token
 
     domain = os.getenv("AUTH0_DOMAIN")
@@ -78,7 +83,9 @@ def _fetch_auth0_token() -> str:
         timeout=10.0,
     )
     response.raise_for_status()
-    _cached_token = response.json()["access_token"]
+    result = response.json()
+    _cached_token = result["access_token"]
+    _token_deadline = time.monotonic() + int(result.get("expires_in", 3600)) * 0.8
     return _cached_token
 
 
@@ -92,9 +99,14 @@ def auth_mode() -> str:
     return "jwt" if _is_jwt_mode() else "none"
 
 
-@pytest.fixture(scope="session")
+@pytest.fixture(scope="function")
 def auth_token() -> str | None:
-    """Return cached Auth0 M2M JWT token, or None in no-auth mode."""
+    """Return cached Auth0 M2M JWT token, or None in no-auth mode.
+
+    Function-scoped so each test re-reads the cache and picks up a
+    refreshed token once the previous one nears expiry; the fetch itself
+    still happens at most once per TTL window.
+    """
     if _is_jwt_mode():
         return _fetch_auth0_token()
     return None
@@ -17,6 +17,11 @@ Usage:
   locust -f load-testing/locustfile.py --host=http://localhost:8081 \\
     --headless -u 50 -r 5 --run-time=2m
 
+  # Distributed (one worker per core -- required to reach 10k TPS)
+  ./scripts/run-distributed-locust.sh
+  # or, on Locust 2.19+:
+  locust -f load-testing/locustfile.py --processes -1 --headless -u 1000 -r 100 -t 5m
+
   # Docker Compose (all-in-one)
   doppler run --project card-fraud-rule-engine --config=local -- \\
     docker compose --profile load-testing up
@@ -27,17 +32,61 @@ Targets:
   - 10,000+ TPS sustained
 """
 
+import itertools
 import json
-import uuid
+import logging
 import random
 import os
-from locust import HttpUser, task, between, constant, events
-import urllib.request
+import time
+from array import array
+
+# Use gevent's c-ares resolver instead of the default threadpool one:
+# name resolution then runs in C on the hub rather than occupying a
+# threadpool slot per new connection. Irrelevant for localhost targets
+# but real for DNS-load-balanced hosts. Must be set before the locust
+# import below pulls in gevent.
+os.environ.setdefault("GEVENT_RESOLVER", "ares")
+
+from locust import task, between, constant, events, LoadTestShape
+from locust.contrib.fasthttp import FastHttpUser
+import urllib3
+
+# orjson decodes these small response bodies ~3-5x faster than stdlib
+# json. It is an optional speedup, not a project dependency, so fall
+# back silently when it is not installed.
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Keep-alive pool for control-plane calls (ruleset bulk-load). Each
+# urllib.request.urlopen paid a fresh TCP(+TLS) handshake; one small
+# PoolManager reuses the connection across retries and repeated CI runs.
+_http = urllib3.PoolManager(
+    num_pools=2,
+    maxsize=4,
+    retries=urllib3.Retry(3, backoff_factor=0.2),
+)
+
+# Unverified-TLS targets emit an InsecureRequestWarning per connection,
+# and urllib3's "connection pool is full" warnings each pay lock+format
+# costs -- hidden per-connection overhead under high fan-out. Silence
+# both once at import.
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
 
 # ========== Configuration ==========
 
 TARGET_HOST = os.environ.get("TARGET_HOST", "http://localhost:8081")
 
+# LIGHT_VALIDATE=1 enables status-code-only validation, skipping the
+# JSON body decode per response. Trade-off: stress runs get the client
+# CPU back, but FAIL_OPEN/DEGRADED engine modes go undetected -- leave
+# this off for correctness runs.
+LIGHT_VALIDATE = os.environ.get("LIGHT_VALIDATE", "0") == "1"
+
 # Test data pools
 CURRENCIES = ["USD", "GBP", "EUR", "CAD", "AUD", "JPY"]
 COUNTRIES = ["US", "GB", "CA", "DE", "FR", "AU", "JP", "IN", "BR", "MX"]
@@ -46,18 +95,62 @@ TRANSACTION_TYPES = ["PURCHASE", "AUTHORIZATION"]
 ENTRY_MODES = ["ECOM", "CHIP", "MAGSTRIPE", "CONTACTLESS", "MANUAL"]
 CARD_HASHES = [f"card_hash_{i:04d}" for i in range(100)]
 
+# Pre-formatted string pools: each ip/device/merchant field otherwise
+# costs randint draws plus f-string formatting per generator call.
+# Building every possible value once and indexing in with _pick keeps
+# the same value space at tuple-lookup cost.
+IP_ADDRESSES = tuple(f"192.168.{i >> 8}.{i & 0xFF}" for i in range(65536))
+DEVICE_IDS = tuple(f"device_{i}" for i in range(1000, 10000))
+MERCHANT_IDS = tuple(f"merch_{i}" for i in range(1000, 10000))
+
 
 # ========== Request Generators ==========
+#
+# Building a fresh 16-key dict plus ~14 random draws per request is pure
+# Python overhead on a path called 10k+ times/sec. Each user instead
+# generates a full request ONCE as a template, then mutates only the
+# truly per-request fields (transaction_id, amount, card_hash) in place.
+# Template reuse is safe because the body is serialized synchronously
+# inside client.post() before the next mutation.
+
+# Module-level bindings: LOAD_GLOBAL on a local name beats attribute
+# lookup on `random` in the hot path.
+_randint = random.randint
+_uniform = random.uniform
+
+# Pre-drawn randomness pool: every random.choice costs a Python-level
+# _randbelow call. Instead, draw 1M uint16 samples once at import and
+# walk them with a counter -- a per-pick array lookup instead of an RNG
+# call. The pool wraps and is reused; cycling a 1M-sample stream is more
+# than enough entropy for load-test field selection.
+_POOL_SIZE = 1 << 20
+_POOL_MASK = _POOL_SIZE - 1
+_IDX_POOL = array("H", random.randbytes(2 * _POOL_SIZE))
+_pool_pos = itertools.count()
+
+
+def _pick(seq):
+    """Cheap random.choice replacement backed by the pre-drawn pool."""
+    return seq[_IDX_POOL[next(_pool_pos) & _POOL_MASK] % len(seq)]
+
+
+# Transaction IDs: uuid4 costs a urandom syscall per call. Load tests
+# only need server-side uniqueness, which a per-process startup nonce
+# plus a monotonic counter provides with no syscalls at all. Workers in
+# distributed mode each draw their own nonce at import.
+_ID_NONCE = os.urandom(6).hex()
+_id_counter = itertools.count()
+
 
 def generate_transaction_id():
-    return f"txn-{uuid.uuid4().hex[:16]}"
+    return f"txn-{_ID_NONCE}{next(_id_counter):010x}"
 
 
 def generate_card_bin():
     visa_bins = ["411111", "400000", "450000"]
     mc_bins = ["555555", "520000", "540000"]
     amex_bins = ["340000", "370000"]
-    return random.choice(visa_bins + mc_bins + amex_bins)
+    return _pick(visa_bins + mc_bins + amex_bins)
 
 
 def generate_AUTH_request():
@@ -68,19 +161,19 @@ def generate_AUTH_request():
     )
     return {
         "transaction_id": generate_transaction_id(),
-        "card_hash": random.choice(CARD_HASHES),
-        "amount": round(random.uniform(10.0, 2000.0), 2),
-        "currency": random.choice(CURRENCIES),
-        "country_code": random.choice(COUNTRIES),
-        "merchant_id": f"merch_{random.randint(1000, 9999)}",
-        "merchant_name": f"Test Merchant {random.randint(1, 100)}",
-        "merchant_category": random.choice(MERCHANT_CATEGORIES),
-        "merchant_category_code": random.choice(MERCHANT_CATEGORIES),
-        "card_present": random.choice([True, False]),
-        "transaction_type": random.choice(TRANSACTION_TYPES),
-        "entry_mode": random.choice(ENTRY_MODES),
-        "ip_address": f"192.168.{random.randint(0, 255)}.{random.randint(0, 255)}",
-        "device_id": f"device_{random.randint(1000, 9999)}",
+        "card_hash": _pick(CARD_HASHES),
+        "amount": round(_uniform(10.0, 2000.0), 2),
+        "currency": _pick(CURRENCIES),
+        "country_code": _pick(COUNTRIES),
+        "merchant_id": _pick(MERCHANT_IDS),
+        "merchant_name": f"Test Merchant {_randint(1, 100)}",
+        "merchant_category": _pick(MERCHANT_CATEGORIES),
+        "merchant_category_code": _pick(MERCHANT_CATEGORIES),
+        "card_present": _pick([True, False]),
+        "transaction_type": _pick(TRANSACTION_TYPES),
+        "entry_mode": _pick(ENTRY_MODES),
+        "ip_address": _pick(IP_ADDRESSES),
+        "device_id": _pick(DEVICE_IDS),
         "card_network": network,
         "card_bin": card_bin,
     }
@@ -89,73 +182,159 @@ def generate_AUTH_request():
 def generate_MONITORING_request():
     return {
         "transaction_id": generate_transaction_id(),
-        "card_hash": random.choice(CARD_HASHES),
-        "amount": round(random.uniform(10.0, 500.0), 2),
-        "currency": random.choice(CURRENCIES),
-        "country_code": random.choice(COUNTRIES),
-        "merchant_id": f"merch_{random.randint(1000, 9999)}",
-        "merchant_category_code": random.choice(MERCHANT_CATEGORIES),
-        "decision": random.choice(["APPROVE", "DECLINE"]),
+        "card_hash": _pick(CARD_HASHES),
+        "amount": round(_uniform(10.0, 500.0), 2),
+        "currency": _pick(CURRENCIES),
+        "country_code": _pick(COUNTRIES),
+        "merchant_id": _pick(MERCHANT_IDS),
+        "merchant_category_code": _pick(MERCHANT_CATEGORIES),
+        "decision": _pick(["APPROVE", "DECLINE"]),
     }
 
 
 def generate_velocity_burst_request():
     req = generate_AUTH_request()
     req["card_hash"] = "velocity_test_card"
-    req["amount"] = round(random.uniform(50.0, 200.0), 2)
+    req["amount"] = round(_uniform(50.0, 200.0), 2)
     return req
 
 
+# Serializing the whole 16-key dict with stdlib json on every post is
+# the single largest client CPU cost for payloads this small. Each user
+# serializes its template ONCE (minus the per-request fields) and the
+# hot path appends just those fields as an f-string, posting raw bytes
+# via data= so the client never re-serializes.
+
+_PER_REQUEST_FIELDS = ("transaction_id", "amount", "card_hash")
+
+
+def make_body_prefix(tpl, variable_fields=_PER_REQUEST_FIELDS):
+    """Serialize a template minus its per-request fields, dropping the
+    closing brace so fresh fields can be appended per request."""
+    static = {k: v for k, v in tpl.items() if k not in variable_fields}
+    return json.dumps(static, separators=(",", ":"))[:-1].encode()
+
+
+def next_AUTH_body(prefix):
+    return prefix + (
+        f',"transaction_id":"txn-{_ID_NONCE}{next(_id_counter):010x}"'
+        f',"amount":{round(_uniform(10.0, 2000.0), 2)}'
+        f',"card_hash":"{_pick(CARD_HASHES)}"}}'
+    ).encode()
+
+
+def next_MONITORING_body(prefix):
+    return prefix + (
+        f',"transaction_id":"txn-{_ID_NONCE}{next(_id_counter):010x}"'
+        f',"amount":{round(_uniform(10.0, 500.0), 2)}'
+        f',"card_hash":"{_pick(CARD_HASHES)}"}}'
+    ).encode()
+
+
+def next_velocity_burst_body(prefix):
+    # card_hash stays pinned to velocity_test_card in the prefix
+    return prefix + (
+        f',"transaction_id":"txn-{_ID_NONCE}{next(_id_counter):010x}"'
+        f',"amount":{round(_uniform(50.0, 200.0), 2)}}}'
+    ).encode()
+
+
 # ========== Locust User Classes ==========
 
-class CardFraudUser(HttpUser):
+# Headers are identical for every user and never change mid-run (the
+# gateway auth model means no per-user Authorization), so one shared
+# dict serves all instances instead of each __init__ building its own.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+class CardFraudUser(FastHttpUser):
     """Standard user: 70% AUTH, 30% MONITORING."""
 
     wait_time = constant(0)  # Fire as fast as possible for throughput testing
 
+    # geventhttpclient settings (FastHttpUser)
+    network_timeout = 10.0
+    connection_timeout = 10.0
+    insecure = True  # Skip TLS verification (replaces requests' verify=False)
+    # A pool of keep-alive connections per user keeps reuse high when
+    # greenlets overlap, cutting TCP/TLS handshakes on both ends;
+    # retries stay off so load tests surface real errors rather than
+    # silently masking them.
+    concurrency = 10
+    max_retries = 0
+
+    # Endpoint constants: avoids re-interning literals in the task bodies
+    _URL_AUTH = "/v1/evaluate/auth"
+    _URL_MON = "/v1/evaluate/monitoring"
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.headers = self._get_headers()
-
-    def on_start(self):
-        self.client.verify = False
-
-    def _get_headers(self):
-        return {"Content-Type": "application/json"}
-
-    @task(7)
-    def AUTH_evaluation(self):
-        with self.client.post(
-            "/v1/evaluate/auth",
-            json=generate_AUTH_request(),
-            headers=self.headers,
-            catch_response=True,
-            name="/v1/evaluate/auth",
-        ) as response:
-            self._handle_response(response, "AUTH")
-
-    @task(3)
-    def MONITORING_evaluation(self):
-        with self.client.post(
-            "/v1/evaluate/monitoring",
-            json=generate_MONITORING_request(),
-            headers=self.headers,
-            catch_response=True,
-            name="/v1/evaluate/monitoring",
-        ) as response:
-            self._handle_response(response, "MONITORING")
+        self.headers = _JSON_HEADERS
+        # Bound method: skips the self.client attribute lookup per request
+        self._post = self.client.post
+        # Per-user templates: fully randomized once, serialized once.
+        # The hot path only appends the per-request fields as bytes.
+        self._auth_prefix = make_body_prefix(generate_AUTH_request())
+        self._monitoring_prefix = make_body_prefix(generate_MONITORING_request())
+
+    # LIGHT_VALIDATE is fixed at import, so the task variant is chosen
+    # once at class-definition time: light mode posts plainly and lets
+    # Locust auto-mark 2xx as success, skipping the catch_response
+    # context-manager entry/exit per request entirely.
+    if LIGHT_VALIDATE:
+        @task(7)
+        def AUTH_evaluation(self):
+            self._post(
+                self._URL_AUTH,
+                data=next_AUTH_body(self._auth_prefix),
+                headers=self.headers,
+                name=self._URL_AUTH,
+            )
+
+        @task(3)
+        def MONITORING_evaluation(self):
+            self._post(
+                self._URL_MON,
+                data=next_MONITORING_body(self._monitoring_prefix),
+                headers=self.headers,
+                name=self._URL_MON,
+            )
+    else:
+        @task(7)
+        def AUTH_evaluation(self):
+            with self._post(
+                self._URL_AUTH,
+                data=next_AUTH_body(self._auth_prefix),
+                headers=self.headers,
+                catch_response=True,
+                name=self._URL_AUTH,
+            ) as response:
+                self._handle_response(response, "AUTH")
+
+        @task(3)
+        def MONITORING_evaluation(self):
+            with self._post(
+                self._URL_MON,
+                data=next_MONITORING_body(self._monitoring_prefix),
+                headers=self.headers,
+                catch_response=True,
+                name=self._URL_MON,
+            ) as response:
+                self._handle_response(response, "MONITORING")
 
     def _handle_response(self, response, eval_type):
         if response.status_code == 200:
+            if LIGHT_VALIDATE:
+                response.success()
+                return
             try:
-                data = response.json()
+                data = _json_loads(response.content)
                 mode = data.get("engine_mode", "NORMAL")
                 if mode in ("FAIL_OPEN", "DEGRADED"):
                     error_code = data.get("engine_error_code", "UNKNOWN")
                     response.failure(f"{mode}: {error_code}")
                 else:
                     response.success()
-            except json.JSONDecodeError:
+            except ValueError:  # json.JSONDecodeError / orjson.JSONDecodeError
                 response.failure("Invalid JSON response")
         else:
             response.failure(f"Status {response.status_code}: {response.text[:100]}")
@@ -168,40 +347,85 @@ class HighVolumeUser(CardFraudUser):
 
 class VelocityTestUser(CardFraudUser):
     """Velocity limit testing user."""
-    wait_time = between(0.1, 0.2)  # 100-200ms between requests
+    wait_time = between(0.1, 0.2)  # between() takes SECONDS: 100-200ms pause
+
+    _NAME_VELOCITY = "/v1/evaluate/auth [velocity]"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._velocity_prefix = make_body_prefix(
+            generate_velocity_burst_request(),
+            variable_fields=("transaction_id", "amount"),
+        )
 
     @task
     def velocity_burst(self):
-        with self.client.post(
-            "/v1/evaluate/auth",
-            json=generate_velocity_burst_request(),
+        with self._post(
+            self._URL_AUTH,
+            data=next_velocity_burst_body(self._velocity_prefix),
             headers=self.headers,
             catch_response=True,
-            name="/v1/evaluate/auth [velocity]",
+            name=self._NAME_VELOCITY,
         ) as response:
             self._handle_response(response, "VELOCITY")
 
 
-class SteadyStateUser(HttpUser):
+class SteadyStateUser(FastHttpUser):
     """Steady-state baseline measurement user."""
-    wait_time = constant(0.1)
+    wait_time = constant(0.1)  # constant() takes SECONDS: 100ms pause
+
+    network_timeout = 10.0
+    connection_timeout = 10.0
+    insecure = True
+    concurrency = 10
+    max_retries = 0
+
+    _URL_AUTH = "/v1/evaluate/auth"
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.headers = self._get_headers()
-
-    def _get_headers(self):
-        return {"Content-Type": "application/json"}
+        self.headers = _JSON_HEADERS
+        self._post = self.client.post
+        self._auth_prefix = make_body_prefix(generate_AUTH_request())
 
     @task
     def AUTH_only(self):
-        self.client.post(
-            "/v1/evaluate/auth",
-            json=generate_AUTH_request(),
+        self._post(
+            self._URL_AUTH,
+            data=next_AUTH_body(self._auth_prefix),
             headers=self.headers,
         )
 
 
+# ========== Load Shape ==========
+
+if os.environ.get("SHAPE") == "gradual":
+    # Locust activates any LoadTestShape subclass it finds in the
+    # locustfile, so this is only defined when explicitly requested --
+    # ad-hoc runs driven by -u/-r are unaffected.
+
+    class GradualLoadShape(LoadTestShape):
+        """Staged ramp to steady state.
+
+        Spawning thousands of users at once causes a TCP connect storm
+        that skews early-run latency; ramping in stages produces stable
+        P95/P99 numbers against the stated SLO targets.
+        """
+
+        stages = [
+            {"duration": 60, "users": 500, "spawn_rate": 50},
+            {"duration": 180, "users": 2000, "spawn_rate": 100},
+            {"duration": 600, "users": 5000, "spawn_rate": 100},
+        ]
+
+        def tick(self):
+            run_time = self.get_run_time()
+            for stage in self.stages:
+                if run_time < stage["duration"]:
+                    return stage["users"], stage["spawn_rate"]
+            return None
+
+
 # ========== Event Handlers ==========
 
 @events.test_start.add_listener
@@ -224,12 +448,15 @@ def on_test_start(environment, **kwargs):
 
         host = environment.host or TARGET_HOST
         url = f"{host}/v1/evaluate/rulesets/bulk-load"
-        data = json.dumps(bulk_load_payload).encode()
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode())
-            print(f"  Rulesets loaded: {result.get('loaded', 0)} / {result.get('total', 0)}")
+        response = _http.request(
+            "POST",
+            url,
+            body=json.dumps(bulk_load_payload).encode(),
+            headers=headers,
+            timeout=30.0,
+        )
+        result = json.loads(response.data)
+        print(f"  Rulesets loaded: {result.get('loaded', 0)} / {result.get('total', 0)}")
     except Exception as e:
         print(f"  Warning: Could not load rulesets: {e}")
         print("  Load test will proceed with existing rulesets (if any)")
@@ -244,8 +471,30 @@ def on_test_stop(environment, **kwargs):
     print("=" * 60)
 
 
+# Slow-request reporting: under overload nearly every response can
+# exceed the threshold, and synchronous stdout writes then throttle the
+# gevent hub -- slow responses causing an even slower generator. A small
+# token bucket caps output at a fixed rate regardless of load.
+log = logging.getLogger("locust.slow")
+
+_SLOW_THRESHOLD_MS = 100
+_SLOW_LOG_RATE = 10  # max messages per second
+_slow_tokens = _SLOW_LOG_RATE
+_slow_refill_at = 0.0
+
+
+def _slow_log_allowed(now):
+    global _slow_tokens, _slow_refill_at
+    if now >= _slow_refill_at:
+        _slow_tokens = _SLOW_LOG_RATE
+        _slow_refill_at = now + 1.0
+    if _slow_tokens > 0:
+        _slow_tokens -= 1
+        return True
+    return False
+
+
 @events.request.add_listener
 def on_request(request_type, name, response_time, response_length, exception, context, **kwargs):
-    # Sample 0.1% of slow requests to avoid flooding console at high TPS
-    if response_time > 100 and random.random() < 0.001:
-        print(f"SLOW: {name} {response_time:.0f}ms")
+    if response_time > _SLOW_THRESHOLD_MS and _slow_log_allowed(time.monotonic()):
+        log.warning("SLOW %s %.0fms", name, response_time)
@@ -0,0 +1,83 @@
+#!/bin/bash
+# Run the in-repo Locust load test in distributed master/worker mode.
+#
+# A single Locust process is pinned to one core by the GIL/gevent hub and
+# caps out well before the 10k TPS target. This script starts one master
+# plus one worker per physical core so generated load scales ~linearly
+# with core count on the load box.
+#
+# On Locust 2.19+ you can skip this script entirely:
+#   locust -f load-testing/locustfile.py --processes -1 --headless -u 1000 -r 100 -t 5m
+# which auto-spawns one worker per core.
+#
+# At sustained 10k+ TPS a single client IP can also exhaust ephemeral
+# ports (EADDRNOTAVAIL) or hit per-source limits on a load balancer.
+# Before a big run, widen the port range and allow TIME_WAIT reuse:
+#   sudo sysctl -w net.ipv4.ip_local_port_range="15000 65535"
+#   sudo sysctl -w net.ipv4.tcp_tw_reuse=1
+#   ulimit -n 65535
+# If that is still not enough, locust-plugins' FastHttpPoolUser spreads
+# each user across a pool of clients/source ports (extra install, not
+# part of this repo's dependency set).
+
+set -e
+
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+USERS="${USERS:-1000}"
+SPAWN_RATE="${SPAWN_RATE:-100}"
+RUN_TIME="${RUN_TIME:-5m}"
+HOST="${RULE_ENGINE_URL:-http://localhost:8081}"
+LOCUSTFILE="${LOCUSTFILE:-load-testing/locustfile.py}"
+NCORES="${NCORES:-$(nproc 2>/dev/null || sysctl -n hw.physicalcpu 2>/dev/null || echo 4)}"
+
+# Warn (don't fail) when the OS would bottleneck a 10k TPS run.
+NOFILE_LIMIT=$(ulimit -n)
+if [ "$NOFILE_LIMIT" != "unlimited" ] && [ "$NOFILE_LIMIT" -lt 65535 ]; then
+    echo -e "${YELLOW}Warning: ulimit -n is $NOFILE_LIMIT; raise to 65535 for high-TPS runs${NC}"
+fi
+if [ -r /proc/sys/net/ipv4/ip_local_port_range ]; then
+    read -r PORT_LO PORT_HI < /proc/sys/net/ipv4/ip_local_port_range
+    if [ $((PORT_HI - PORT_LO)) -lt 40000 ]; then
+        echo -e "${YELLOW}Warning: ephemeral port range is $PORT_LO-$PORT_HI; widen it to avoid EADDRNOTAVAIL (see header)${NC}"
+    fi
+fi
+
+echo -e "${GREEN}=== Distributed Locust Load Test ===${NC}"
+echo "Target:     $HOST"
+echo "Users:      $USERS"
+echo "Spawn Rate: $SPAWN_RATE/sec"
+echo "Run Time:   $RUN_TIME"
+echo "Workers:    $NCORES"
+echo ""
+
+WORKER_PIDS=()
+cleanup() {
+    for pid in "${WORKER_PIDS[@]}"; do
+        kill "$pid" 2>/dev/null || true
+    done
+}
+trap cleanup EXIT
+
+# Workers first so they are connected before the master starts spawning.
+# Each worker imports the locustfile independently, so module-level state
+# (data pools, cached config) is initialized per process.
+echo -e "${YELLOW}Starting $NCORES workers...${NC}"
+for i in $(seq 1 "$NCORES"); do
+    locust -f "$LOCUSTFILE" --worker --master-host=127.0.0.1 &
+    WORKER_PIDS+=($!)
+done
+
+echo -e "${YELLOW}Starting master...${NC}"
+locust -f "$LOCUSTFILE" \
+    --master \
+    --expect-workers "$NCORES" \
+    --host "$HOST" \
+    --headless \
+    -u "$USERS" \
+    -r "$SPAWN_RATE" \
+    -t "$RUN_TIME"
+
+echo -e "${GREEN}Load test complete!${NC}"